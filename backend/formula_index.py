@@ -0,0 +1,383 @@
+import re
+from typing import List, Dict, Optional, Tuple
+
+
+# ---------------------------------------------------
+# PHYSICS VOCABULARY
+# ---------------------------------------------------
+
+# Canonical term -> synonyms (all lowercase). The canonical term is also matched.
+PHYSICS_TERMS: Dict[str, List[str]] = {
+    "escape velocity": ["escape speed"],
+    "orbital velocity": ["orbital speed"],
+    "gravitational potential energy": [],
+    "gravitational constant": ["universal gravitational constant"],
+    "acceleration due to gravity": ["gravitational acceleration", "free-fall acceleration"],
+    "kinetic energy": [],
+    "potential energy": [],
+    "work": ["work done"],
+    "power": [],
+    "momentum": ["linear momentum"],
+    "impulse": [],
+    "force": [],
+    "torque": ["moment of force"],
+    "angular momentum": [],
+    "moment of inertia": ["rotational inertia"],
+    "centripetal acceleration": ["radial acceleration"],
+    "centripetal force": [],
+    "pressure": [],
+    "density": [],
+    "young's modulus": ["young modulus", "youngs modulus"],
+    "bulk modulus": [],
+    "shear modulus": ["modulus of rigidity"],
+    "surface tension": [],
+    "viscosity": ["coefficient of viscosity"],
+    "specific heat": ["specific heat capacity"],
+    "latent heat": ["heat of transformation"],
+    "thermal conductivity": [],
+    "efficiency": ["thermal efficiency"],
+    "entropy": [],
+    "frequency": [],
+    "angular frequency": [],
+    "wavelength": [],
+    "wave speed": ["speed of a wave"],
+    "period": ["time period"],
+    "simple harmonic motion": ["shm"],
+    "doppler effect": ["doppler shift"],
+    "coulomb's law": ["coulombs law", "coulomb law"],
+    "electric field": [],
+    "electric potential": [],
+    "electric flux": [],
+    "capacitance": [],
+    "electric current": ["current"],
+    "resistance": [],
+    "resistivity": [],
+    "ohm's law": ["ohms law", "ohm law"],
+    "magnetic field": [],
+    "magnetic flux": [],
+    "inductance": ["self-inductance"],
+    "magnetic force": ["lorentz force"],
+    "refractive index": ["index of refraction"],
+    "focal length": [],
+    "lens maker's formula": ["lensmaker's equation", "lens maker formula", "lensmaker equation"],
+}
+
+# Intent -> cue words in a question that mark it as a direct lookup
+QUERY_INTENTS: Dict[str, List[str]] = {
+    "unit": ["si unit", "si units", "unit", "units"],
+    "formula": ["formula", "formulas", "equation", "equations", "expression", "relation"],
+    "definition": ["define", "definition", "meaning"],
+}
+
+# Words that may surround a lookup without changing what is being asked
+# (apostrophes are stripped before checking, so "what's" -> "whats")
+_FILLER_WORDS = {
+    "what", "whats", "is", "are", "the", "a", "an", "of", "for", "give", "me",
+    "tell", "state", "write", "show", "please", "in", "its", "and", "to", "by",
+}
+
+MAX_SNIPPETS_PER_KIND = 3
+MAX_SNIPPET_CHARS = 300
+
+# A line that is an equation on its own rather than wrapped prose: it has "="
+# and either a numbered equation tag such as "(7-1)" or almost no words
+_EQUATION_TAG = re.compile(r"\(\d{1,2}-\d{1,3}\)\s*$")
+_PROSE_WORD = re.compile(r"[A-Za-z]{3,}")
+_MAX_EQUATION_LINE_WORDS = 3
+
+# Worked examples rather than general formulas: a number followed by a unit, or
+# a chain of "=" ending in a plain value ("... = 2.25 J")
+_UNIT_VALUE = re.compile(
+    r"(?:\d\.\d+\s*(?:kg|g|m/s\^?2?|m|s|j|n|w|pa|hz|wb|ev|cm|km|mm|k|c|v|a|t|rad/s)"
+    r"|\d\s+(?:kg|m/s\^?2?|pa|hz|wb|ev|cm|km|mm|rad/s))(?![\w^])"
+)
+_PLAIN_VALUE = re.compile(r"^[-+\u2212]?\d[\d.,]*(?:\s*[\u00d7x]\s*10\^?[-\u2212]?\d+)?\s*[a-z/\u03a9]{0,5}\.?$")
+
+
+def _normalize(text: str) -> str:
+    """Lowercase, fold typographic apostrophes and collapse whitespace"""
+    text = text.replace("\u2019", "'").replace("\u2018", "'")
+    return re.sub(r"\s+", " ", text.lower()).strip()
+
+
+def _phrase_pattern(phrases: List[str]) -> re.Pattern:
+    """Build a word-bounded alternation, longest phrase first"""
+    return re.compile(_phrase_regex(phrases))
+
+
+def _phrase_regex(phrases: List[str]) -> str:
+    ordered = sorted(set(phrases), key=len, reverse=True)
+    return r"(?<![\w'])(" + "|".join(re.escape(p) for p in ordered) + r")(?![\w'])"
+
+
+_SYNONYM_TO_TERM: Dict[str, str] = {
+    phrase: term
+    for term, synonyms in PHYSICS_TERMS.items()
+    for phrase in [term, *synonyms]
+}
+_TERM_PATTERN = _phrase_pattern(list(_SYNONYM_TO_TERM))
+
+_INTENT_TO_KIND: Dict[str, str] = {
+    cue: kind for kind, cues in QUERY_INTENTS.items() for cue in cues
+}
+_INTENT_PATTERN = _phrase_pattern(list(_INTENT_TO_KIND))
+
+# Subject patterns: the captured term is what the sentence is about. The side
+# says where the answer text must be for the snippet to be worth returning.
+_TERM = _phrase_regex(list(_SYNONYM_TO_TERM))
+_LEADING_TERM = re.compile(r"^(?:the |a |an )?" + _TERM)
+_SUBJECT_PATTERNS: Dict[str, List[Tuple[re.Pattern, str]]] = {
+    "definition": [
+        (
+            re.compile(
+                r"^(?:the |a |an )?" + _TERM
+                + r"(?: (?:of|for) [^,;]{0,40}?)?(?: ?\([^)]*\))? (?:is|are) defined (?:as|to be)\b"
+            ),
+            "after",
+        ),
+        (re.compile(r"\b(?:is|are) (?:called|known as) (?:the )?" + _TERM), "before"),
+        (re.compile(r"\bwe define (?:the )?" + _TERM + r" as\b"), "after"),
+    ],
+    "unit": [
+        (re.compile(r"\bunits? (?:of|for) (?:the )?" + _TERM), "after"),
+        (re.compile(r"^(?:the )?" + _TERM + r" (?:is|are) measured in\b"), "after"),
+    ],
+}
+
+# Answer text needs at least this many words on the expected side of the cue
+_MIN_ANSWER_WORDS = 2
+
+
+def _subject(kind: str, sentence: str) -> Optional[str]:
+    """Return the term a normalized sentence defines or gives the unit of, if complete"""
+    for pattern, side in _SUBJECT_PATTERNS[kind]:
+        match = pattern.search(sentence)
+        if not match:
+            continue
+        answer = sentence[match.end():] if side == "after" else sentence[: match.start()]
+        if len(re.findall(r"\w+", answer)) >= _MIN_ANSWER_WORDS:
+            return _SYNONYM_TO_TERM[match.group(1)]
+    return None
+
+
+def _introduced_term(intro: str) -> Optional[str]:
+    """Term an equation's introducing text is about: its leading term, else its only term"""
+    leading = _LEADING_TERM.search(intro)
+    if leading:
+        return _SYNONYM_TO_TERM[leading.group(1)]
+
+    terms = {_SYNONYM_TO_TERM[m] for m in _TERM_PATTERN.findall(intro)}
+    return terms.pop() if len(terms) == 1 else None
+
+
+def _is_general_formula(equation: str) -> bool:
+    """True if a normalized equation has a right-hand side and is not a worked example"""
+    sides = [side.strip() for side in equation.split("=")]
+    rhs = " ".join(sides[1:])
+    if not re.search(r"\w", sides[-1]):
+        return False
+    if _UNIT_VALUE.search(rhs):
+        return False
+    return not (len(sides) > 2 and _PLAIN_VALUE.match(sides[-1]))
+
+
+def is_complete_snippet(kind: str, text: str) -> bool:
+    """Check that a snippet carries the answer after its cue, not just the cue"""
+    lowered = _normalize(text)
+    if kind == "formula":
+        return "=" in lowered and _is_general_formula(lowered)
+    return _subject(kind, lowered) is not None
+
+
+# ---------------------------------------------------
+# INGESTION
+# ---------------------------------------------------
+
+def _is_equation_line(line: str) -> bool:
+    return "=" in line and (
+        bool(_EQUATION_TAG.search(line))
+        or len(_PROSE_WORD.findall(line)) <= _MAX_EQUATION_LINE_WORDS
+    )
+
+
+def _page_segments(page_text: str, word_offset: int) -> List[Tuple[str, int]]:
+    """Split a page into (segment, word offset) pairs.
+
+    PDF text wraps every line, so prose lines are rejoined (dropping hyphens at
+    line breaks) and split into sentences; equation lines stay separate segments.
+    Offsets count words the way ``RAGEngine.chunk_text`` does.
+    """
+    segments: List[Tuple[str, int]] = []
+    tokens: List[Tuple[str, int]] = []
+    offset = word_offset
+
+    def flush():
+        sentence: List[Tuple[str, int]] = []
+        for i, (token, position) in enumerate(tokens):
+            sentence.append((token, position))
+            following = tokens[i + 1][0] if i + 1 < len(tokens) else ""
+            if not following or (token[-1] in ".!?" and following[0] in "ABCDEFGHIJKLMNOPQRSTUVWXYZ("):
+                segments.append((" ".join(t for t, _ in sentence), sentence[0][1]))
+                sentence = []
+        tokens.clear()
+
+    for line in page_text.splitlines():
+        words = line.split()
+        if not words:
+            continue
+
+        if _is_equation_line(line):
+            flush()
+            segments.append((" ".join(words), offset))
+        else:
+            for j, word in enumerate(words):
+                previous = tokens[-1][0] if tokens else ""
+                if j == 0 and len(previous) > 1 and previous.endswith("-") and previous[-2].isalpha() and word[0].islower():
+                    tokens[-1] = (previous[:-1] + word, tokens[-1][1])
+                else:
+                    tokens.append((word, offset + j))
+
+        offset += len(words)
+
+    flush()
+    return segments
+
+
+def build_formula_index(
+    page_texts: List[str], chunk_size: int = 500, overlap: int = 50
+) -> Dict[str, Dict[str, List[dict]]]:
+    """Extract formula, unit and definition snippets per physics term with their pages.
+
+    Each snippet is filed only under the term that is its subject. Formulas from
+    numbered equation lines such as "(7-1)" are preferred over incidental ones.
+    ``chunk_size``/``overlap`` must match ``RAGEngine.chunk_text`` so each snippet
+    can point at the vector-store chunk where it starts.
+    """
+    candidates: Dict[str, Dict[str, List[Tuple[Tuple[bool, int], dict]]]] = {}
+    step = chunk_size - overlap
+    word_offset = 0
+    order = 0
+    previous: Optional[Tuple[str, int, int]] = None
+
+    for page_num, page_text in enumerate(page_texts):
+        for sentence, offset in _page_segments(page_text, word_offset):
+            lowered = _normalize(sentence)
+            found: Dict[str, Tuple[str, str, int, int]] = {}
+
+            for kind in _SUBJECT_PATTERNS:
+                term = _subject(kind, lowered)
+                if term:
+                    found[kind] = (term, sentence, page_num, offset)
+
+            if "=" in lowered and _is_general_formula(lowered):
+                # Text before "=" minus the symbol itself; if that is only the
+                # symbol, the equation is introduced by the previous sentence
+                intro_words = lowered.split("=", 1)[0].split()[:-1]
+                if intro_words:
+                    term = _introduced_term(" ".join(intro_words))
+                    snippet = (sentence, page_num, offset)
+                elif previous:
+                    term = _introduced_term(_normalize(previous[0]))
+                    snippet = (f"{previous[0]} {sentence}", previous[1], previous[2])
+                else:
+                    term = None
+                if term:
+                    found["formula"] = (term, *snippet)
+
+            for kind, (term, snippet, page, start) in found.items():
+                snippet = re.sub(r"\s+", " ", snippet)[:MAX_SNIPPET_CHARS]
+                entries = candidates.setdefault(term, {}).setdefault(kind, [])
+                if all(entry["text"] != snippet for _, entry in entries):
+                    untagged = kind == "formula" and not _EQUATION_TAG.search(sentence)
+                    entries.append(
+                        (
+                            (untagged, order),
+                            {"text": snippet, "page": page, "chunk_id": start // step},
+                        )
+                    )
+                    order += 1
+
+            previous = (sentence, page_num, offset)
+
+        word_offset += len(page_text.split())
+
+    return {
+        term: {
+            kind: [entry for _, entry in sorted(entries, key=lambda e: e[0])[:MAX_SNIPPETS_PER_KIND]]
+            for kind, entries in kinds.items()
+        }
+        for term, kinds in candidates.items()
+    }
+
+
+# ---------------------------------------------------
+# LOOKUP
+# ---------------------------------------------------
+
+def parse_lookup_query(question: str) -> Optional[Tuple[str, str]]:
+    """Return (term, kind) if the question is a direct formula/unit/definition lookup"""
+    normalized = _normalize(re.sub(r"[^\w\s'-]", " ", _normalize(question)))
+
+    kinds = {_INTENT_TO_KIND[m] for m in _INTENT_PATTERN.findall(normalized)}
+    terms = {_SYNONYM_TO_TERM[m] for m in _TERM_PATTERN.findall(normalized)}
+
+    # Questions naming several terms or several intents go through full RAG
+    if len(kinds) != 1 or len(terms) != 1:
+        return None
+
+    # Anything beyond filler words means the question needs real reasoning
+    remainder = _INTENT_PATTERN.sub(" ", _TERM_PATTERN.sub(" ", normalized))
+    if any(word.replace("'", "") not in _FILLER_WORDS for word in remainder.split()):
+        return None
+
+    return terms.pop(), kinds.pop()
+
+
+def lookup(
+    index: Dict[str, Dict[str, List[dict]]], question: str
+) -> Optional[Tuple[str, str, List[dict]]]:
+    """Find complete indexed snippets answering a direct lookup question, or None"""
+    if not index:
+        return None
+
+    parsed = parse_lookup_query(question)
+    if not parsed:
+        return None
+
+    term, kind = parsed
+    entries = [
+        entry
+        for entry in index.get(term, {}).get(kind, [])
+        if is_complete_snippet(kind, entry["text"])
+    ]
+    if not entries:
+        return None
+
+    return term, kind, entries
+
+
+def answer_lookup(index: Dict[str, Dict[str, List[dict]]], question: str) -> Optional[Dict]:
+    """Build an ask()-style answer with sources from the index, or None to fall back to RAG"""
+    match = lookup(index, question)
+    if not match:
+        return None
+
+    term, kind, entries = match
+    labels = {"formula": "Formula", "unit": "SI unit", "definition": "Definition"}
+    answer = f"{labels[kind]} for {term} (from the textbook):\n\n" + "\n\n".join(
+        f"• {entry['text']} (page {entry['page'] + 1})" for entry in entries
+    )
+
+    sources = [
+        {
+            "text": entry["text"],
+            "page": entry["page"],
+            "chunk_id": entry["chunk_id"],
+        }
+        for entry in entries
+    ]
+
+    return {
+        "answer": answer,
+        "sources": sources,
+    }
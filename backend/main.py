@@ -49,6 +49,12 @@ if os.path.exists(DEFAULT_BOOK_PATH):
         
         if has_book:
             print(f"✓ Default book already loaded from database: {stats['documents_count']} chunks")
+
+            # Databases created before the formula index existed: build it
+            # from the page text only, without re-embedding the book
+            if not rag_engine.has_formula_index():
+                with open(DEFAULT_BOOK_PATH, "rb") as f:
+                    rag_engine.update_formula_index(rag_engine.extract_pages_from_pdf(f.read()))
         else:
             if stats['documents_count'] > 0:
                 print(f"⚠️  Found {stats['documents_count']} chunks in DB, but not from default_book.pdf")
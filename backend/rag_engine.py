@@ -1,6 +1,9 @@
 import os
+import json
+import time
+from bisect import bisect_right
 from io import BytesIO
-from typing import List, Dict, Tuple
+from typing import List, Dict, Optional, Tuple
 
 import chromadb
 from chromadb.config import Settings
@@ -9,6 +12,8 @@ import google.generativeai as genai
 from groq import Groq
 import PyPDF2
 
+from backend.formula_index import build_formula_index, answer_lookup
+
 
 class RAGEngine:
     def __init__(self, gemini_api_key: str = None, groq_api_key: str = None):
@@ -37,6 +42,10 @@ class RAGEngine:
             metadata={"hnsw:space": "cosine"},
         )
 
+        # ✅ Load formula/definition index (saved next to ChromaDB)
+        self.formula_index_path = os.path.join(persist_dir, "formula_index.json")
+        self.formula_index = self.load_formula_index()
+
         # ✅ Initialize AI Provider (Groq or Gemini)
         self.ai_provider = None
         self.model_name = None
@@ -93,18 +102,17 @@ class RAGEngine:
     # PDF PROCESSING
     # ---------------------------------------------------
 
-    def extract_text_from_pdf(self, pdf_file: bytes) -> Tuple[str, int]:
-        """Extract text from PDF file"""
+    def extract_pages_from_pdf(self, pdf_file: bytes) -> List[str]:
+        """Extract text from each page of a PDF file"""
         pdf_reader = PyPDF2.PdfReader(BytesIO(pdf_file))
-        text = ""
-        pages = len(pdf_reader.pages)
+        return [page.extract_text() or "" for page in pdf_reader.pages]
 
-        for page in pdf_reader.pages:
-            page_text = page.extract_text()
-            if page_text:
-                text += page_text + "\n\n"
+    def extract_text_from_pdf(self, pdf_file: bytes) -> Tuple[str, List[str]]:
+        """Extract text from PDF file, along with the text of each page"""
+        page_texts = self.extract_pages_from_pdf(pdf_file)
+        text = "".join(page_text + "\n\n" for page_text in page_texts if page_text)
 
-        return text.strip(), pages
+        return text.strip(), page_texts
 
     def chunk_text(
         self, text: str, chunk_size: int = 500, overlap: int = 50
@@ -120,6 +128,19 @@ class RAGEngine:
 
         return chunks
 
+    def chunk_pages(
+        self, page_texts: List[str], num_chunks: int, chunk_size: int = 500, overlap: int = 50
+    ) -> List[int]:
+        """Map each chunk from chunk_text to the 0-based PDF page its first word is on"""
+        page_starts: List[int] = []
+        word_offset = 0
+        for page_text in page_texts:
+            page_starts.append(word_offset)
+            word_offset += len(page_text.split())
+
+        step = chunk_size - overlap
+        return [bisect_right(page_starts, i * step) - 1 for i in range(num_chunks)]
+
     def process_pdf(self, pdf_file: bytes, filename: str) -> Dict:
         """Process PDF: extract text, create chunks, generate embeddings, store in DB"""
 
@@ -128,7 +149,8 @@ class RAGEngine:
 
         # ✅ Extract text
         print("📖 Extracting text from PDF...")
-        text, pages = self.extract_text_from_pdf(pdf_file)
+        text, page_texts = self.extract_text_from_pdf(pdf_file)
+        pages = len(page_texts)
         print(f"✅ Extracted {len(text)} characters from {pages} pages")
 
         # ✅ Create chunks
@@ -155,11 +177,12 @@ class RAGEngine:
 
         # ✅ Store in ChromaDB
         ids = [f"chunk_{i}" for i in range(len(chunks))]
+        chunk_pages = self.chunk_pages(page_texts, len(chunks))
         metadatas = [
             {
                 "filename": filename,
                 "chunk_id": i,
-                "page": i // 3,
+                "page": chunk_pages[i],
             }
             for i in range(len(chunks))
         ]
@@ -173,11 +196,60 @@ class RAGEngine:
 
         # ✅ Data is automatically persisted with PersistentClient
 
+        # ✅ Build formula/definition index for instant lookups
+        self.update_formula_index(page_texts)
+
         return {
             "pages": pages,
             "chunks": len(chunks),
         }
 
+    # ---------------------------------------------------
+    # FORMULA INDEX
+    # ---------------------------------------------------
+
+    def load_formula_index(self) -> Dict:
+        """Load the persisted formula/definition index, if any"""
+        try:
+            with open(self.formula_index_path, "r", encoding="utf-8") as f:
+                return json.load(f)
+        except FileNotFoundError:
+            return {}
+        except Exception as e:
+            print("⚠️ Error loading formula index:", e)
+            return {}
+
+    def has_formula_index(self) -> bool:
+        """Check if a formula/definition index has been saved to disk"""
+        return os.path.exists(self.formula_index_path)
+
+    def update_formula_index(self, page_texts: List[str]):
+        """Build the formula/definition index from page texts and persist it"""
+        print("🔎 Indexing formulas, units and definitions...")
+        self.formula_index = build_formula_index(page_texts)
+        self.save_formula_index()
+        print(f"✅ Indexed {len(self.formula_index)} physics terms")
+
+    def save_formula_index(self):
+        """Persist the formula/definition index next to ChromaDB"""
+        try:
+            with open(self.formula_index_path, "w", encoding="utf-8") as f:
+                json.dump(self.formula_index, f)
+        except Exception as e:
+            print("⚠️ Error saving formula index:", e)
+
+    def answer_from_index(self, question: str) -> Optional[Dict]:
+        """Answer direct formula/unit/definition lookups without an LLM call"""
+        start = time.perf_counter()
+        result = answer_lookup(self.formula_index, question)
+        if not result:
+            return None
+
+        elapsed_ms = (time.perf_counter() - start) * 1000
+        print(f"⚡ Answered from formula index in {elapsed_ms:.2f} ms")
+
+        return result
+
     # ---------------------------------------------------
     # RETRIEVAL
     # ---------------------------------------------------
@@ -258,6 +330,11 @@ Answer:"""
     def ask(self, question: str) -> Dict:
         """Complete RAG pipeline: retrieve context and generate answer"""
 
+        # Fast path: direct lookups are served from the formula index
+        indexed = self.answer_from_index(question)
+        if indexed:
+            return indexed
+
         contexts, metadatas = self.retrieve_context(question)
         answer = self.generate_answer(question, contexts)
 
@@ -313,5 +390,7 @@ Answer:"""
             if existing_items.get("ids"):
                 self.collection.delete(ids=existing_items["ids"])
             # Data is automatically persisted with PersistentClient
+            self.formula_index = {}
+            self.save_formula_index()
         except Exception as e:
             print(f"Note: Collection was empty or error clearing: {e}")
@@ -0,0 +1,250 @@
+"""
+Tests for the formula/definition index used by the fast path in RAGEngine.ask
+"""
+import importlib
+import importlib.util
+import os
+import sys
+from unittest import mock
+
+import pytest
+
+# Add parent directory to path
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from backend.formula_index import (
+    answer_lookup,
+    build_formula_index,
+    lookup,
+    parse_lookup_query,
+)
+
+
+def _texts(index, term, kind):
+    return [entry["text"] for entry in index.get(term, {}).get(kind, [])]
+
+
+# ---------------------------------------------------
+# INGESTION
+# ---------------------------------------------------
+
+def test_definition_filed_under_subject_only():
+    index = build_formula_index(["Power is defined as the rate of doing work."])
+
+    assert _texts(index, "power", "definition") == ["Power is defined as the rate of doing work."]
+    assert "work" not in index
+
+
+def test_called_definition_uses_term_after_cue():
+    index = build_formula_index(["The rate of doing work is called power."])
+
+    assert _texts(index, "power", "definition") == ["The rate of doing work is called power."]
+    assert "work" not in index
+
+
+def test_formula_filed_under_introducing_term():
+    index = build_formula_index(["The work done by a force is W = F d"])
+
+    assert _texts(index, "work", "formula") == ["The work done by a force is W = F d"]
+    assert "force" not in index
+
+
+def test_formula_introduced_by_previous_line():
+    index = build_formula_index(["The escape speed from a planet is\nv = sqrt(2GM/R) (13-28)"])
+
+    assert _texts(index, "escape velocity", "formula") == [
+        "The escape speed from a planet is v = sqrt(2GM/R) (13-28)"
+    ]
+
+
+def test_multi_sentence_line_split_per_unit():
+    index = build_formula_index(["The SI unit of force is newton. The SI unit of work is joule."])
+
+    assert _texts(index, "force", "unit") == ["The SI unit of force is newton."]
+    assert _texts(index, "work", "unit") == ["The SI unit of work is joule."]
+
+
+def test_curly_apostrophe_terms_are_indexed():
+    index = build_formula_index(["Young’s modulus is defined as the ratio of stress to strain."])
+
+    assert "young's modulus" in index
+
+
+def test_wrapped_definition_is_rejoined():
+    index = build_formula_index(
+        ["Rotation needs a twist. Torque is defined as\nthe product of the force and moment arm."]
+    )
+
+    assert _texts(index, "torque", "definition") == [
+        "Torque is defined as the product of the force and moment arm."
+    ]
+
+
+def test_wrapped_unit_is_indexed():
+    index = build_formula_index(["The SI unit of\nmagnetic flux is the weber."])
+
+    assert _texts(index, "magnetic flux", "unit") == ["The SI unit of magnetic flux is the weber."]
+
+
+def test_hyphen_at_line_break_is_removed():
+    index = build_formula_index(["The kinetic en-\nergy of a particle of mass m is\nK = mv^2/2 (7-1)"])
+
+    assert _texts(index, "kinetic energy", "formula") == [
+        "The kinetic energy of a particle of mass m is K = mv^2/2 (7-1)"
+    ]
+
+
+def test_cut_off_definition_is_not_stored():
+    index = build_formula_index(["Torque is defined as"])
+
+    assert "torque" not in index
+
+
+def test_sample_problem_is_not_stored_as_formula():
+    index = build_formula_index(
+        ["The kinetic energy of the ball is K = (1/2)(0.50 kg)(3.0 m/s)^2 = 2.25 J."]
+    )
+
+    assert "kinetic energy" not in index
+
+
+def test_numbered_equation_preferred_over_earlier_formulas():
+    early = [f"The kinetic energy here is K = p^2/{n}m" for n in range(2, 6)]
+    index = build_formula_index(
+        early + ["The kinetic energy of a particle is\nK = mv^2/2 (7-1)"]
+    )
+
+    texts = _texts(index, "kinetic energy", "formula")
+    assert texts[0] == "The kinetic energy of a particle is K = mv^2/2 (7-1)"
+    assert len(texts) == 3
+
+
+def test_previous_sentence_snippet_points_where_it_starts():
+    filler = " ".join(["word"] * 449)
+    pages = [filler + ". The escape speed from a planet is", "v = sqrt(2GM/R) (13-28)"]
+    index = build_formula_index(pages, chunk_size=500, overlap=50)
+
+    entry = index["escape velocity"]["formula"][0]
+    assert entry["page"] == 0
+    # Snippet text starts at word 449, inside chunk 0; the equation is at word 456
+    assert entry["chunk_id"] == 0
+
+
+def test_page_numbers_and_chunk_ids_match_chunk_boundaries():
+    filler = " ".join(["word"] * 460)
+    pages = [filler, "", "Torque is defined as the cross product of r and F."]
+    index = build_formula_index(pages, chunk_size=500, overlap=50)
+
+    entry = index["torque"]["definition"][0]
+    assert entry["page"] == 2
+    # Snippet starts at word 460; chunks step by 450 words, so it opens in chunk 1
+    assert entry["chunk_id"] == 1
+
+
+# ---------------------------------------------------
+# LOOKUP
+# ---------------------------------------------------
+
+@pytest.mark.parametrize(
+    "question, expected",
+    [
+        ("formula for escape velocity", ("escape velocity", "formula")),
+        ("SI unit of magnetic flux?", ("magnetic flux", "unit")),
+        ("Define torque", ("torque", "definition")),
+        ("What's the formula for escape velocity?", ("escape velocity", "formula")),
+        ("What’s the formula for escape velocity?", ("escape velocity", "formula")),
+        ("What is the formula of Young’s modulus", ("young's modulus", "formula")),
+        ("formula for work done", ("work", "formula")),
+    ],
+)
+def test_parse_lookup_query_matches(question, expected):
+    assert parse_lookup_query(question) == expected
+
+
+@pytest.mark.parametrize(
+    "question",
+    [
+        "force and momentum formula",
+        "formula for work done by a force",
+        "Derive the formula for escape velocity",
+        "What is the formula for escape velocity of a planet with mass 2M",
+        "dimensions of power",
+        "explain torque",
+    ],
+)
+def test_parse_lookup_query_falls_through(question):
+    assert parse_lookup_query(question) is None
+
+
+def test_lookup_requires_indexed_kind():
+    index = build_formula_index(["Torque is defined as the cross product of r and F."])
+
+    assert lookup(index, "define torque")[0:2] == ("torque", "definition")
+    assert lookup(index, "formula for torque") is None
+    assert lookup({}, "define torque") is None
+
+
+def test_lookup_skips_incomplete_stored_snippets():
+    index = {"torque": {"definition": [{"text": "Torque is defined as", "page": 0, "chunk_id": 0}]}}
+
+    assert lookup(index, "define torque") is None
+
+
+def test_answer_lookup_formats_answer_and_sources():
+    index = build_formula_index(["", "The SI unit of\nmagnetic flux is the weber."])
+
+    result = answer_lookup(index, "SI unit of magnetic flux")
+
+    assert result["answer"].startswith("SI unit for magnetic flux")
+    assert "(page 2)" in result["answer"]
+    assert result["sources"] == [
+        {"text": "The SI unit of magnetic flux is the weber.", "page": 1, "chunk_id": 0}
+    ]
+    assert answer_lookup(index, "Derive the SI unit of magnetic flux") is None
+
+
+# ---------------------------------------------------
+# RAG ENGINE FAST PATH
+# ---------------------------------------------------
+
+def _module_missing(name):
+    try:
+        return importlib.util.find_spec(name) is None
+    except ModuleNotFoundError:
+        return True
+
+
+def test_ask_fast_path_skips_retrieval_and_generation(monkeypatch):
+    # RAGEngine is built with __new__, so heavy backends are never used here;
+    # stand in for any that are not installed so the import succeeds
+    for name in (
+        "chromadb",
+        "chromadb.config",
+        "sentence_transformers",
+        "google",
+        "google.generativeai",
+        "groq",
+        "PyPDF2",
+    ):
+        if _module_missing(name):
+            monkeypatch.setitem(sys.modules, name, mock.MagicMock())
+    monkeypatch.delitem(sys.modules, "backend.rag_engine", raising=False)
+    RAGEngine = importlib.import_module("backend.rag_engine").RAGEngine
+
+    engine = RAGEngine.__new__(RAGEngine)
+    engine.formula_index = build_formula_index(
+        ["Torque is defined as the cross product of r and F."]
+    )
+
+    def fail(*args, **kwargs):
+        raise AssertionError("fast path must not call retrieval or generation")
+
+    engine.retrieve_context = fail
+    engine.generate_answer = fail
+
+    result = engine.ask("define torque")
+
+    assert "cross product" in result["answer"]
+    assert result["sources"] == [
+        {"text": "Torque is defined as the cross product of r and F.", "page": 0, "chunk_id": 0}
+    ]